@@ -2,7 +2,7 @@
 
 {
     "name": "AI Call Lead Export",
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.1.0",
     "summary": "Automated AI Call Campaigns: Export Leads to Webhook with Tagging & Logging",
     "description": """
 AI Call Lead Export
@@ -14,10 +14,12 @@ Key Features:
 *   **Campaign Management:** Create multiple campaigns with specific filters (e.g., by Stage, Tag, Country).
 *   **Automated Scheduling:** Set specific time windows (Start/End Time) for campaigns to run, respecting your local timezone.
 *   **Throttling:** Control the speed of exports with a configurable delay between requests.
+*   **Batching:** Send leads to the webhook in configurable batches, one request per batch.
 *   **Webhook Integration:** Sends Lead ID, Name, Email, and Phone Number to your specified Webhook URL.
 *   **Smart Tagging:** Automatically tags leads as "AI Call" upon successful export to prevent duplicate calls.
 *   **Detailed Logging:** Tracks every attempt with status (Pending, OK, Error), HTTP response codes, and timestamps.
 *   **Manual & Auto Modes:** Trigger campaigns manually or let the Cron job handle it automatically.
+*   **Background Sending:** When the OCA ``queue_job`` module is installed, sends run as queued jobs (channel ``root.n8n``).
     """,
     "category": "CRM",
     "author": "Waqas Mustafaa",
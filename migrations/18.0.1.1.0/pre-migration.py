@@ -0,0 +1,15 @@
+def migrate(cr, version):
+    """
+    Keep existing campaigns resending every matching record: create the
+    skip_already_ok column before the ORM does, so it is not filled with
+    the new default (True) on upgrade.
+    """
+    if not version:
+        return
+    cr.execute(
+        """
+        ALTER TABLE n8n_campaign
+        ADD COLUMN IF NOT EXISTS skip_already_ok boolean DEFAULT false
+        """
+    )
+    cr.execute("ALTER TABLE n8n_campaign ALTER COLUMN skip_already_ok DROP DEFAULT")
@@ -1,20 +1,249 @@
 import ast
+import gzip
+import json
 import logging
+import random
 import time
 import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import pytz
-from datetime import time as dt_time  # for time-of-day comparison
+from datetime import datetime, timedelta
+from functools import lru_cache
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from odoo.tools import SQL, config, ormcache, split_every
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     requests = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httpx
+    import h2  # noqa: F401 (needed by httpx for HTTP/2)
+except ImportError:
+    httpx = None
+
 _logger = logging.getLogger(__name__)
 
+# Matching records are counted up to this value only
+RECORD_COUNT_LIMIT = 10000
+
+# Smaller payloads are sent uncompressed (gzip overhead exceeds savings)
+GZIP_MIN_SIZE = 1024
+
+# Webhook answers worth retrying (rate limited / transient server errors)
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+# Timeout (seconds) of a single webhook request
+REQUEST_TIMEOUT = 20
+
+# A run stops starting new batches after at most this many seconds and
+# resumes on the next cron run, so one large campaign cannot hold the
+# scheduler (see N8nCampaign._get_run_time_budget())
+RUN_TIME_BUDGET = 240
+
+# First key of the per-campaign advisory locks (arbitrary, unique to this module)
+RUN_LOCK_NAMESPACE = 0x6E386E
+
+
+def _build_session():
+    """
+    Return a keep-alive session with a pooled adapter. Retries are done by
+    _post_with_retry() so they follow the campaign settings.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=32,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+# Shared by all campaigns so TCP/TLS connections to the webhook host are reused
+_SESSION = _build_session() if requests is not None else None
+
+# HTTP/2 client (one multiplexed connection per host), when httpx[http2] is installed
+_HTTP2_CLIENT = (
+    httpx.Client(
+        http2=True,
+        # Like requests, so a redirected webhook is not taken for a success
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+    )
+    if httpx is not None
+    else None
+)
+
+# Network errors worth retrying, for both transports
+_TRANSIENT_ERRORS = (
+    (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    if requests is not None
+    else ()
+) + ((httpx.TransportError,) if httpx is not None else ())
+
+
+def _json_dumps(payload):
+    """Serialize payload to JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+# Token buckets shared by all campaigns posting to the same webhook URL:
+# {url: (available tokens, time.monotonic() of last refill)}
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def _acquire_token(url, rate_per_minute, burst):
+    """Block until the token bucket of url allows one more request."""
+    if rate_per_minute <= 0:
+        return
+    burst = max(burst, 1)
+    while True:
+        with _BUCKETS_LOCK:
+            now = time.monotonic()
+            tokens, last = _BUCKETS.get(url, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate_per_minute / 60.0)
+            if tokens >= 1:
+                _BUCKETS[url] = (tokens - 1, now)
+                return
+            _BUCKETS[url] = (tokens, now)
+            delay = (1 - tokens) * 60.0 / rate_per_minute
+        time.sleep(delay)
+
+
+def _parse_retry_after(value, default=60):
+    """Return the Retry-After header value in seconds (delay form only)."""
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+def _post_with_retry(options, body, headers):
+    """
+    POST body to the webhook, retrying connection errors, timeouts and
+    429/5xx answers with exponential backoff and jitter (or the
+    Retry-After delay when given). Other answers are returned at once.
+    """
+    attempts = max(options["max_retries"], 0) + 1
+    for attempt in range(attempts):
+        last_attempt = attempt + 1 >= attempts
+        retry_after = None
+        _acquire_token(options["url"], options["rate_per_minute"], options["burst"])
+        try:
+            if options["http2"] and _HTTP2_CLIENT is not None:
+                response = _HTTP2_CLIENT.post(
+                    options["url"],
+                    content=body,
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT,
+                )
+            else:
+                response = _SESSION.post(
+                    options["url"],
+                    data=body,
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT,
+                )
+        except _TRANSIENT_ERRORS as e:
+            if last_attempt:
+                raise
+            reason = str(e)
+        else:
+            if response.status_code not in RETRYABLE_STATUS or last_attempt:
+                return response
+            reason = f"HTTP {response.status_code}"
+            retry_after = response.headers.get("Retry-After")
+
+        delay_ms = min(options["retry_max_ms"], options["retry_base_ms"] * 2 ** attempt)
+        delay = delay_ms * (1 + random.uniform(-0.25, 0.25)) / 1000
+        if retry_after is not None:
+            delay = min(_parse_retry_after(retry_after, delay), options["retry_max_ms"] / 1000)
+        _logger.info(
+            "Campaign '%s': attempt %d/%d failed (%s), retrying in %.1f seconds",
+            options["name"],
+            attempt + 1,
+            attempts,
+            reason,
+            delay,
+        )
+        time.sleep(max(delay, 0))
+
+
+def _post_payload(options, payload):
+    """
+    Serialize and send one batch payload; return the outcome as log values
+    plus "retry_after" (seconds) when the webhook kept answering 429.
+
+    Runs in worker threads: it must not touch the ORM or the database.
+    """
+    outcome = {"retry_after": None}
+    try:
+        body = _json_dumps(payload)
+        headers = {"Content-Type": "application/json"}
+        if options["compress"] and len(body) >= GZIP_MIN_SIZE:
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+
+        response = _post_with_retry(options, body, headers)
+        outcome["http_status"] = str(response.status_code)
+
+        # Same rule as requests' Response.ok, for both transports
+        if response.status_code < 400:
+            outcome["status"] = "ok"
+        else:
+            outcome["status"] = "error"
+            # Decode only the logged prefix: response.text would run charset
+            # detection over the whole body (e.g. a large proxy error page)
+            outcome["message"] = response.content[:500].decode("utf-8", errors="replace")
+            if response.status_code == 429:
+                outcome["retry_after"] = _parse_retry_after(response.headers.get("Retry-After"))
+    except Exception as e:
+        _logger.exception("Error sending data to n8n")
+        outcome["status"] = "error"
+        outcome["message"] = str(e)[:500]
+    # One timestamp for the whole batch, whichever way it ended
+    outcome["sent_at"] = fields.Datetime.now()
+    return outcome
+
+
+def _freeze(value):
+    """Recursively turn lists into tuples so parsed domains can be shared."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=64)
+def _get_timezone(tz_name):
+    """Return the (cached) pytz timezone for tz_name, falling back to UTC."""
+    try:
+        return pytz.timezone(tz_name)
+    except pytz.UnknownTimeZoneError:
+        _logger.warning("Unknown timezone %s, falling back to UTC", tz_name)
+        return pytz.utc
+
+
+@lru_cache(maxsize=256)
+def _get_utc_offset_minutes(tz_name, epoch_hour):
+    """Return the UTC offset of tz_name, in minutes, during the given epoch hour."""
+    local_dt = datetime.fromtimestamp(epoch_hour * 3600, _get_timezone(tz_name))
+    return int(local_dt.utcoffset().total_seconds()) // 60
+
 
 class N8nCampaign(models.Model):
     _name = "n8n.campaign"
@@ -49,16 +278,95 @@ class N8nCampaign(models.Model):
         help="Build record filter using domain widget.",
     )
 
+    # Stored: recomputed when the filter changes, and refreshed by a cron
+    # (or the Refresh button) as matching leads change
     record_count = fields.Integer(
         string="Matching Records",
         compute="_compute_record_count",
+        compute_sudo=True,
+        store=True,
+        readonly=True,
+    )
+
+    record_count_display = fields.Char(
+        string="Matching Records",
+        compute="_compute_record_count",
+        compute_sudo=True,
+        store=True,
         readonly=True,
     )
 
     delay_seconds = fields.Integer(
         string="Delay (seconds)",
         default=0,
-        help="Wait this many seconds before sending the next record to n8n.",
+        help="Wait this many seconds before sending the next batch to n8n. "
+        "With a delay, each run sends one round of batches and the scheduler "
+        "sends the next round once the delay has elapsed.",
+    )
+
+    batch_size = fields.Integer(
+        string="Batch Size",
+        default=50,
+        help="Number of records sent to the webhook in a single request.",
+    )
+
+    concurrency = fields.Integer(
+        string="Concurrent Requests",
+        default=1,
+        help="Maximum number of batches sent to the webhook at the same time.",
+    )
+
+    rate_per_minute = fields.Integer(
+        string="Rate Limit (requests/min)",
+        default=0,
+        help="Maximum number of webhook requests per minute, shared by all campaigns "
+        "using the same Webhook URL. 0 means unlimited.",
+    )
+
+    burst = fields.Integer(
+        string="Burst",
+        default=10,
+        help="Number of requests that may be sent at once before the rate limit applies.",
+    )
+
+    max_retries = fields.Integer(
+        string="Max Retries",
+        default=3,
+        help="Retry a batch this many times on connection errors, timeouts "
+        "and HTTP 429/5xx answers, with exponential backoff.",
+    )
+
+    retry_base_ms = fields.Integer(
+        string="Retry Base Delay (ms)",
+        default=500,
+        help="Delay before the first retry; it doubles on every attempt.",
+    )
+
+    retry_max_ms = fields.Integer(
+        string="Retry Max Delay (ms)",
+        default=30000,
+        help="Upper bound for a single retry delay, including Retry-After.",
+    )
+
+    compress_payload = fields.Boolean(
+        string="Compress Payload",
+        default=False,
+        help="Send payloads of 1 KB or more gzip-compressed (Content-Encoding: gzip). "
+        "Only enable it if the webhook accepts compressed request bodies.",
+    )
+
+    use_http2 = fields.Boolean(
+        string="Use HTTP/2",
+        default=False,
+        help="Send over HTTP/2, multiplexing concurrent requests on one connection. "
+        "Requires the Python 'httpx' and 'h2' libraries; HTTP/1.1 is used otherwise.",
+    )
+
+    skip_already_ok = fields.Boolean(
+        string="Skip Already Sent",
+        default=True,
+        help="Do not resend records that were already sent successfully by this campaign. "
+        "Disable it to send every matching record again on each run.",
     )
 
     # 🔁 toggle field
@@ -81,6 +389,43 @@ class N8nCampaign(models.Model):
         default=23.99,  # ~23:59
     )
 
+    start_minute = fields.Integer(
+        string="Start Minute",
+        compute="_compute_window_minutes",
+        store=True,
+        help="Start Time as minutes of the day, used by the scheduler.",
+    )
+
+    end_minute = fields.Integer(
+        string="End Minute",
+        compute="_compute_window_minutes",
+        store=True,
+        help="End Time as minutes of the day, used by the scheduler.",
+    )
+
+    # ⏱ pacing state (delay between rounds of batches)
+    run_started_at = fields.Datetime(
+        string="Current Run Started At",
+        readonly=True,
+        copy=False,
+        help="Start of the run in progress; records logged since then are not sent again until it completes.",
+    )
+
+    manual_sweep = fields.Boolean(
+        string="Started Manually",
+        readonly=True,
+        copy=False,
+        help="The sweep in progress was started with Send Calls: the scheduler "
+        "finishes it even if the campaign is not active.",
+    )
+
+    next_run_at = fields.Datetime(
+        string="Next Run At",
+        readonly=True,
+        copy=False,
+        help="The scheduler will not send the next round of batches before this time.",
+    )
+
     log_ids = fields.One2many(
         "n8n.campaign.log",
         "campaign_id",
@@ -88,18 +433,62 @@ class N8nCampaign(models.Model):
         readonly=True,
     )
 
+    # ---------------------------------------------------
+    # ORM OVERRIDES
+    # ---------------------------------------------------
+    def write(self, vals):
+        if "is_active" in vals and not vals["is_active"]:
+            # Turning a campaign off also stops its sweep in progress
+            vals = dict(vals, **self._get_reset_sweep_values())
+        return super().write(vals)
+
     # ---------------------------------------------------
     # COMPUTE & HELPERS
     # ---------------------------------------------------
     @api.depends("filter_domain", "target_model")
     def _compute_record_count(self):
+        # One (bounded) COUNT per distinct target/filter pair
+        counts = {}
         for campaign in self:
-            model = campaign._get_target_model()
-            domain = campaign._get_domain()
-            if not model:
+            key = (campaign.target_model, campaign.filter_domain)
+            if key not in counts:
+                model = campaign._get_target_model()
+                if model is None:
+                    counts[key] = 0
+                else:
+                    # A broken filter (e.g. a removed field) must not fail the
+                    # refresh of every other campaign, nor a module update
+                    try:
+                        domain = campaign._get_domain()
+                        counts[key] = model.search_count(domain, limit=RECORD_COUNT_LIMIT)
+                    except (UserError, ValueError) as e:
+                        _logger.warning(
+                            "Campaign '%s': cannot count matching records: %s",
+                            campaign.name,
+                            e,
+                        )
+                        counts[key] = None
+            count = counts[key]
+            if count is None:
                 campaign.record_count = 0
-                continue
-            campaign.record_count = model.search_count(domain)
+                campaign.record_count_display = "?"
+            else:
+                campaign.record_count = count
+                campaign.record_count_display = (
+                    f"{count}+" if count >= RECORD_COUNT_LIMIT else str(count)
+                )
+
+    def _refresh_record_count(self):
+        """Recompute the stored record counts of these campaigns."""
+        fnames = ["record_count", "record_count_display"]
+        for fname in fnames:
+            self.env.add_to_compute(self._fields[fname], self)
+        self.flush_recordset(fnames)
+
+    @api.model
+    def _cron_refresh_record_count(self):
+        """Cron: refresh the stored record counts of all campaigns."""
+        self.search([])._refresh_record_count()
 
     def _get_target_model(self):
         """Return env model object based on target_model selection."""
@@ -108,32 +497,43 @@ class N8nCampaign(models.Model):
             return self.env["crm.lead"]
         return None
 
-    def _get_domain(self):
-        """Parse the domain string into a Python list."""
-        self.ensure_one()
-        if not self.filter_domain:
-            return []
+    @ormcache("filter_domain")
+    def _parse_filter_domain(self, filter_domain):
+        """Parse a domain string once; the (immutable) result is cached."""
         try:
-            value = ast.literal_eval(self.filter_domain)
+            value = ast.literal_eval(filter_domain)
             if isinstance(value, (list, tuple)):
-                return value
+                return _freeze(value)
             raise ValueError("Domain must be list/tuple")
         except Exception as e:
             raise UserError(_("Invalid domain in Filter: %s") % e)
 
+    def _get_domain(self):
+        """Return the parsed domain string as a Python list."""
+        self.ensure_one()
+        if self.filter_domain in (False, "", "[]"):
+            return []
+        return list(self._parse_filter_domain(self.filter_domain))
+
     # ---- Time helpers -----------------------------------------------------
 
     @staticmethod
-    def _float_to_time(value):
-        """Convert float hour (e.g. 13.5) into datetime.time(13, 30)."""
+    def _float_to_minutes(value, default):
+        """Convert float hour (e.g. 13.5) into minutes of the day (810)."""
         if value is False or value is None:
-            return None
+            return default
         hours = int(value)
         minutes = int(round((value - hours) * 60))
         # safety clamp
         hours = max(0, min(23, hours))
         minutes = max(0, min(59, minutes))
-        return dt_time(hours, minutes, 0)
+        return hours * 60 + minutes
+
+    @api.depends("start_time", "end_time")
+    def _compute_window_minutes(self):
+        for campaign in self:
+            campaign.start_minute = self._float_to_minutes(campaign.start_time, 0)
+            campaign.end_minute = self._float_to_minutes(campaign.end_time, 1439)
 
     def _is_within_time_window(self):
         """Return True if current time (owner's timezone) is within Start–End window."""
@@ -142,43 +542,370 @@ class N8nCampaign(models.Model):
         # Use campaign owner timezone if available, else current user
         owner = self.create_uid or self.env.user
         tz_name = owner.tz or "UTC"
-        
-        try:
-            user_tz = pytz.timezone(tz_name)
-        except pytz.UnknownTimeZoneError:
-            _logger.warning("Unknown timezone %s for user %s, falling back to UTC", tz_name, owner.name)
-            user_tz = pytz.utc
 
-        now_utc = fields.Datetime.now()
-        # Convert UTC now to owner's timezone
-        # fields.Datetime.now() returns naive datetime (implicitly UTC in Odoo)
-        utc_now_aware = pytz.utc.localize(now_utc)
-        local_now = utc_now_aware.astimezone(user_tz)
-        local_t = local_now.time()
+        # Local minute of the day, from the epoch and the (cached) UTC offset
+        now_minutes = int(time.time()) // 60
+        offset = _get_utc_offset_minutes(tz_name, now_minutes // 60)
+        local_minute = (now_minutes + offset) % 1440
 
-        start_t = self._float_to_time(self.start_time) or dt_time(0, 0, 0)
-        end_t = self._float_to_time(self.end_time) or dt_time(23, 59, 59)
+        start_minute = self.start_minute
+        end_minute = self.end_minute
+        if start_minute <= end_minute:
+            match = start_minute <= local_minute <= end_minute
+        else:
+            # Overnight window, e.g. 22:00 - 06:00
+            match = local_minute >= start_minute or local_minute <= end_minute
 
         _logger.info(
-            "Campaign '%s' Time Check: Local Time (%s) = %s. Window: %s - %s. Match? %s",
+            "Campaign '%s' Time Check: Local Time (%s) = %02d:%02d. Window: %02d:%02d - %02d:%02d. Match? %s",
             self.name,
             tz_name,
-            local_t,
-            start_t,
-            end_t,
-            start_t <= local_t <= end_t
+            *divmod(local_minute, 60),
+            *divmod(start_minute, 60),
+            *divmod(end_minute, 60),
+            match
         )
-
-        # Simple inclusive check (no overnight window for now)
-        return start_t <= local_t <= end_t
+        return match
 
     # ---------------------------------------------------
     # CORE SENDING LOGIC (reused by cron + manual)
     # ---------------------------------------------------
+    def _get_payload_fields(self):
+        """Return the target model fields read to build the payload."""
+        self.ensure_one()
+        model = self._get_target_model()
+        return [
+            fname
+            for fname in ("name", "email_from", "email", "phone", "mobile")
+            if fname in model._fields
+        ]
+
+    def _fetch_payload_rows(self, domain, limit=None):
+        """
+        Return the payload columns of the records matching domain and not
+        sent yet (see _get_unsent_condition()), ordered by id, as plain
+        dicts fetched by a single SELECT (access rules applied) without
+        building a recordset.
+        """
+        self.ensure_one()
+        model = self._get_target_model()
+        fnames = ["id"] + self._get_payload_fields()
+        query = model._search(domain, order="id", limit=limit)
+        unsent = self._get_unsent_condition(SQL.identifier(query.table, "id"))
+        if unsent:
+            query.add_where(unsent)
+
+        if not all(model._fields[fname].column_type for fname in fnames):
+            # Non-stored fields can only be read through the ORM
+            return model.browse(query).read(fnames[1:])
+
+        return self.env.execute_query_dict(
+            query.select(
+                *(
+                    SQL(
+                        "%s AS %s",
+                        model._field_to_sql(query.table, fname, query),
+                        SQL.identifier(fname),
+                    )
+                    for fname in fnames
+                )
+            )
+        )
+
+    def _prepare_lead_payload(self, row):
+        """Return the webhook payload entry for a single lead, from its column values."""
+        return {
+            "id": row["id"],
+            "name": row.get("name") or "",
+            "email": row.get("email_from") or row.get("email") or "",
+            "phone": row.get("phone") or row.get("mobile") or "",
+        }
+
+    def _get_ai_call_tag(self):
+        """Return the 'AI Call' CRM tag, creating it if needed."""
+        tag_name = "AI Call"
+        # Search for existing tag (case-insensitive)
+        TagModel = self.env["crm.tag"]
+        tag = TagModel.search([("name", "=ilike", tag_name)], limit=1)
+        if not tag:
+            tag = TagModel.create({"name": tag_name})
+        return tag
+
+    def _get_unsent_condition(self, id_column):
+        """
+        Return the SQL condition excluding, from the records whose id is
+        id_column, those already sent successfully by this campaign (if
+        skip_already_ok) or already handled by the sweep in progress, or
+        None when nothing is excluded.
+
+        Each exclusion is a separate NOT EXISTS, so the database plans it
+        as an anti-join (NOT IN cannot be) and the "sent" one is served by
+        the (campaign_id, status, lead_odoo_id) index.
+        """
+        self.ensure_one()
+        self.env["n8n.campaign.log"].flush_model(
+            ["campaign_id", "lead_odoo_id", "status", "create_date"]
+        )
+        conditions = []
+        if self.skip_already_ok:
+            conditions.append(
+                SQL(
+                    """NOT EXISTS (
+                        SELECT 1 FROM n8n_campaign_log log
+                         WHERE log.campaign_id = %s AND log.status = 'ok'
+                           AND log.lead_odoo_id = %s
+                    )""",
+                    self.id,
+                    id_column,
+                )
+            )
+        if self.run_started_at:
+            conditions.append(
+                SQL(
+                    """NOT EXISTS (
+                        SELECT 1 FROM n8n_campaign_log log
+                         WHERE log.campaign_id = %s AND log.lead_odoo_id = %s
+                           AND log.create_date >= %s
+                    )""",
+                    self.id,
+                    id_column,
+                    self.run_started_at,
+                )
+            )
+        return SQL(" AND ").join(conditions) if conditions else None
+
+    def _schedule_next_run(self, next_run_at):
+        """Remember when the next round may be sent and wake the cron up then."""
+        self.ensure_one()
+        self.next_run_at = next_run_at
+        cron = self.env.ref("n8n_lead_export.ir_cron_n8n_campaigns", raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger(at=next_run_at)
+
+    @api.model
+    def _get_reset_sweep_values(self):
+        """Return the values clearing the sweep state (the next run starts over)."""
+        return {"run_started_at": False, "next_run_at": False, "manual_sweep": False}
+
+    def _reset_sweep(self):
+        """Clear the sweep state of these campaigns."""
+        self.write(self._get_reset_sweep_values())
+
+    def _get_send_options(self):
+        """Return the plain settings worker threads need to post a batch."""
+        self.ensure_one()
+        return {
+            "name": self.name,
+            "url": self.webhook_url,
+            "rate_per_minute": self.rate_per_minute,
+            "burst": self.burst,
+            "max_retries": self.max_retries,
+            "retry_base_ms": self.retry_base_ms,
+            "retry_max_ms": self.retry_max_ms,
+            "compress": self.compress_payload,
+            "http2": self.use_http2,
+        }
+
+    def _claim_batch(self, rows, payload_base):
+        """
+        Claim one batch of records (payload column dicts returned by
+        _fetch_payload_rows()): one INSERT of pending logs, skipping records
+        still claimed by an interrupted run. Return (logs, lead ids, payload), or None when
+        nothing was left to send.
+        """
+        self.ensure_one()
+        records = [self._prepare_lead_payload(row) for row in rows]
+        logs, claimed_ids = self.env["n8n.campaign.log"]._claim_records(self, records)
+        # Commit immediately so logs appear in UI (and the claim is visible)
+        self.env.cr.commit()
+        if len(claimed_ids) < len(records):
+            _logger.info(
+                "Campaign '%s': %d record(s) already in flight, skipped",
+                self.name,
+                len(records) - len(claimed_ids),
+            )
+            records = [record for record in records if record["id"] in claimed_ids]
+            if not records:
+                return None
+
+        lead_ids = [record["id"] for record in records]
+        payload = dict(payload_base, count=len(records), records=records)
+        return logs, lead_ids, payload
+
+    def _write_batch_result(self, logs, leads, tag, outcome):
+        """
+        Record the outcome of a batch on its logs (single UPDATE), tag the
+        leads on success and commit. Return False when the webhook asked
+        to slow down and the run must stop.
+        """
+        self.ensure_one()
+        outcome = dict(outcome)
+        retry_after = outcome.pop("retry_after")
+
+        logs.write(outcome)
+        if outcome["status"] == "ok":
+            # Add 'AI Call' tag to every lead of the batch
+            leads.write({"tag_ids": [(4, tag.id)]})
+        # Commit the batch result (and tag updates)
+        self.env.cr.commit()
+
+        if retry_after is not None:
+            _logger.warning(
+                "Campaign '%s' is rate limited by the webhook, retrying in %s seconds.",
+                self.name,
+                retry_after,
+            )
+            self._schedule_next_run(fields.Datetime.now() + timedelta(seconds=retry_after))
+            self.env.cr.commit()
+            return False
+        return True
+
+    def _get_run_time_budget(self):
+        """
+        Return for how many seconds a run may start new batches: the
+        worker time limit (limit_time_real_cron, or limit_time_real when
+        negative; the HTTP limit also applies to manual and queue_job
+        runs), capped at RUN_TIME_BUDGET, minus what a batch started just
+        before can still take when every attempt times out (with the
+        exponential backoff delays; Retry-After answers may add more).
+        """
+        self.ensure_one()
+        limit_real = config.get("limit_time_real", 120)
+        limit_cron = config.get("limit_time_real_cron", -1)
+        if limit_cron < 0:
+            limit_cron = limit_real
+        limits = [limit for limit in (limit_real, limit_cron) if limit > 0]
+        budget = min([RUN_TIME_BUDGET] + limits)
+
+        attempts = max(self.max_retries, 0) + 1
+        backoff_ms = sum(
+            min(self.retry_max_ms, self.retry_base_ms * 2 ** attempt)
+            for attempt in range(attempts - 1)
+        )
+        tail = attempts * REQUEST_TIMEOUT + backoff_ms / 1000
+        return max(budget - tail, 0)
+
+    def _send_batches(self, batches, deadline):
+        """
+        Send batches with up to `concurrency` requests in flight. Only the
+        HTTP calls run in worker threads; claiming and logging stay in this
+        thread, as Odoo cursors are not thread-safe.
+
+        Return None when every batch was handled, otherwise why sending
+        stopped early: "end_time", "rate_limited" or "time_budget"
+        (no new batch but the first is started after `deadline`, a
+        time.monotonic() value, so every run makes progress).
+        """
+        self.ensure_one()
+        # Resolved once per run rather than once per batch
+        options = self._get_send_options()
+        model = self._get_target_model()
+        tag = self._get_ai_call_tag()
+        payload_base = {
+            "campaign_id": self.id,
+            "campaign_name": self.name,
+            "target_model": self.target_model,
+        }
+        concurrency = max(self.concurrency, 1)
+        batches = iter(batches)
+        in_flight = {}
+        stop_reason = None
+        started = 0
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix=f"Campaign-{self.id}",
+        ) as executor:
+            try:
+                while True:
+                    # Keep the pool busy while there is work and no reason to stop
+                    while not stop_reason and len(in_flight) < concurrency:
+                        rows = next(batches, None)
+                        if rows is None:
+                            break
+                        # Check time window before each batch
+                        if not self._is_within_time_window():
+                            _logger.warning(
+                                "Campaign '%s' reached End Time during execution. Stopping now.",
+                                self.name
+                            )
+                            stop_reason = "end_time"
+                            break
+                        if started and time.monotonic() > deadline:
+                            _logger.info(
+                                "Campaign '%s' used its time budget, resuming on the next run.",
+                                self.name
+                            )
+                            stop_reason = "time_budget"
+                            break
+                        claimed = self._claim_batch(rows, payload_base)
+                        if claimed:
+                            logs, lead_ids, payload = claimed
+                            future = executor.submit(_post_payload, options, payload)
+                            in_flight[future] = (logs, model.browse(lead_ids))
+                            started += 1
+
+                    if not in_flight:
+                        break
+                    done, _not_done = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        logs, leads = in_flight.pop(future)
+                        if not self._write_batch_result(logs, leads, tag, future.result()):
+                            stop_reason = "rate_limited"
+            except Exception:
+                # Record what the batches in flight did before giving up, so
+                # records already delivered are not sent again later
+                self.env.cr.rollback()
+                for future, (logs, leads) in in_flight.items():
+                    self._write_batch_result(logs, leads, tag, future.result())
+                raise
+
+        return stop_reason
+
+    def _try_lock_run(self):
+        """
+        Take the advisory lock of this campaign, held by the database
+        session until _unlock_run() (commits do not release it), so only
+        one run at a time claims and sends its records. Return False when
+        another run holds it.
+        """
+        self.ensure_one()
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_lock(%s, %s)", (RUN_LOCK_NAMESPACE, self.id)
+        )
+        return self.env.cr.fetchone()[0]
+
+    def _is_run_in_progress(self):
+        """Return True when a run of this campaign currently holds its lock."""
+        self.ensure_one()
+        if not self._try_lock_run():
+            return True
+        self._unlock_run()
+        return False
+
+    def _unlock_run(self):
+        """Release the advisory lock taken by _try_lock_run()."""
+        self.ensure_one()
+        self.env.cr.execute(
+            "SELECT pg_advisory_unlock(%s, %s)", (RUN_LOCK_NAMESPACE, self.id)
+        )
+
     def _send_pending_leads_via_n8n(self):
         """
-        Send ALL matching leads to n8n (always resend),
-        respecting delay_seconds and logging each attempt.
+        Send matching leads to n8n (skipping those already sent
+        successfully, unless skip_already_ok is off) in batches of
+        batch_size records per request, up to `concurrency` batches in
+        flight at once, logging each attempt.
+
+        Every run is a resumable sweep (run_started_at): it stops starting
+        batches once its time budget is used and the scheduler resumes it
+        right away, skipping records already handled by the sweep. With
+        delay_seconds, only one round of batches is sent and the next round
+        is left to the scheduler (next_run_at) instead of blocking the
+        worker in a sleep.
+
+        Runs of a campaign never overlap: a run started while another one
+        holds the campaign lock (see _try_lock_run()) skips the campaign.
         """
         if requests is None:
             raise UserError(
@@ -198,108 +925,99 @@ class N8nCampaign(models.Model):
                     _("Unsupported target model: %s") % (campaign.target_model,)
                 )
 
-            domain = campaign._get_domain()
-            leads = model.search(domain)
+            if not campaign._try_lock_run():
+                _logger.info(
+                    "Campaign '%s' is already being sent by another run, skipped",
+                    campaign.name,
+                )
+                continue
+            try:
+                # Start a new snapshot, so everything the previous run of
+                # this campaign committed (logs, sweep state) is visible
+                self.env.cr.commit()
+                campaign.invalidate_recordset()
+                campaign._send_run()
+                # Commit the sweep state before another run can take the lock
+                self.env.cr.commit()
+            except Exception:
+                self.env.cr.rollback()
+                raise
+            finally:
+                campaign._unlock_run()
 
-            _logger.info(
-                "Sending %s records to n8n webhook %s",
-                len(leads),
-                campaign.webhook_url,
-            )
+        return True
 
-            Log = self.env["n8n.campaign.log"]
+    def _send_run(self):
+        """
+        Send one run of the campaign (see _send_pending_leads_via_n8n()).
+        The caller must hold the campaign run lock.
+        """
+        self.ensure_one()
+        deadline = time.monotonic() + self._get_run_time_budget()
+        paced = self.delay_seconds > 0
+        if not self.run_started_at:
+            # Transaction time, so logs created by this run compare >= to it
+            self.run_started_at = self.env.cr.now()
 
-            for lead in leads:
-                email = getattr(lead, "email_from", False) or getattr(
-                    lead, "email", False
-                )
-                phone = getattr(lead, "phone", False) or getattr(
-                    lead, "mobile", False
-                )
+        batch_size = max(self.batch_size, 1)
+        concurrency = max(self.concurrency, 1)
+        # A paced run sends one round; one extra row tells if more remain
+        limit = batch_size * concurrency + 1 if paced else None
 
-                # --- NEW: Check time window inside the loop ---
-                if not campaign._is_within_time_window():
-                    _logger.warning(
-                        "Campaign '%s' reached End Time during execution. Stopping now.",
-                        campaign.name
-                    )
-                    break
-                # ----------------------------------------------
-
-                # 1) create log as pending
-                log = Log.create(
-                    {
-                        "campaign_id": campaign.id,
-                        "lead_id": lead.id,
-                        "lead_odoo_id": lead.id,
-                        "name": lead.name or "",
-                        "email": email or "",
-                        "phone": phone or "",
-                        "status": "pending",
-                    }
-                )
-                # Commit immediately so log appears in UI
-                self.env.cr.commit()
+        # Search and read the unsent payload columns in a single query
+        rows = self._fetch_payload_rows(self._get_domain(), limit=limit)
+        batches = list(split_every(batch_size, rows))
 
-                # 2) build payload for single record
-                payload = {
-                    "campaign_id": campaign.id,
-                    "campaign_name": campaign.name,
-                    "target_model": campaign.target_model,
-                    "count": 1,
-                    "records": [
-                        {
-                            "id": lead.id,
-                            "name": lead.name or "",
-                            "email": email or "",
-                            "phone": phone or "",
-                        }
-                    ],
-                }
-
-                try:
-                    response = requests.post(
-                        campaign.webhook_url,
-                        json=payload,
-                        timeout=20,
-                    )
-                    log.http_status = str(response.status_code)
-                    log.sent_at = fields.Datetime.now()
-
-                    if response.ok:
-                        log.status = "ok"
-                        # --- NEW: Add 'AI Call' tag to the lead ---
-                        tag_name = "AI Call"
-                        # Search for existing tag (case-insensitive)
-                        TagModel = self.env["crm.tag"]
-                        tag = TagModel.search([("name", "=ilike", tag_name)], limit=1)
-                        if not tag:
-                            tag = TagModel.create({"name": tag_name})
-                        
-                        # Add tag to lead if not present
-                        if tag.id not in lead.tag_ids.ids:
-                            lead.write({"tag_ids": [(4, tag.id)]})
-                        # Commit successful send with tag update
-                        self.env.cr.commit()
-                        # ------------------------------------------
-                    else:
-                        log.status = "error"
-                        log.message = (response.text or "")[:500]
-                        # Commit error status
-                        self.env.cr.commit()
-                except Exception as e:
-                    _logger.exception("Error sending data to n8n")
-                    log.status = "error"
-                    log.sent_at = fields.Datetime.now()
-                    log.message = str(e)[:500]
-                    # Commit exception error
-                    self.env.cr.commit()
-
-                # 3) delay before next lead
-                if campaign.delay_seconds and campaign.delay_seconds > 0:
-                    time.sleep(campaign.delay_seconds)
+        more_rounds = paced and len(batches) > concurrency
+        if more_rounds:
+            batches = batches[:concurrency]
 
-        return True
+        _logger.info(
+            "Sending %s records to n8n webhook %s in %s batch(es) of %s, %s at a time",
+            sum(len(batch) for batch in batches),
+            self.webhook_url,
+            len(batches),
+            batch_size,
+            concurrency,
+        )
+
+        stop_reason = self._send_batches(batches, deadline) if batches else None
+        if stop_reason == "time_budget":
+            # Resume as soon as the scheduler runs again
+            self._schedule_next_run(fields.Datetime.now())
+        elif not stop_reason and more_rounds:
+            # The delay counts from the end of this round, retries included
+            self._schedule_next_run(
+                fields.Datetime.now() + timedelta(seconds=self.delay_seconds)
+            )
+        elif not stop_reason:
+            # Sweep complete: the next run starts over
+            self._reset_sweep()
+
+    # ---------------------------------------------------
+    # BACKGROUND EXECUTION (OCA queue_job, when installed)
+    # ---------------------------------------------------
+    def _queue_job_available(self):
+        """Return True when the optional OCA 'queue_job' module is installed."""
+        return hasattr(self, "with_delay")
+
+    def _enqueue_send(self):
+        """
+        Enqueue one background job per campaign. The identity key keeps at
+        most one job waiting per campaign; a job started while another run
+        is sending the campaign skips it (see _try_lock_run()).
+        """
+        for campaign in self:
+            campaign.with_delay(
+                channel="root.n8n",
+                description=_("AI Call campaign: %s") % campaign.name,
+                identity_key=f"n8n.campaign,{campaign.id}",
+            )._send_pending_leads_via_n8n()
+            _logger.info(
+                "Enqueued campaign '%s' (ID: %d) in queue_job",
+                campaign.name,
+                campaign.id
+            )
 
     # ---------------------------------------------------
     # THREAD-SAFE WRAPPER FOR PARALLEL EXECUTION
@@ -344,20 +1062,79 @@ class N8nCampaign(models.Model):
     # ---------------------------------------------------
     # MANUAL ACTION (debug / manual send)
     # ---------------------------------------------------
+    def action_refresh_count(self):
+        """Recount matching records (e.g. after leads changed)."""
+        self._refresh_record_count()
+        return True
+
     def action_send_to_n8n(self):
-        """Manual trigger – send all matching leads now."""
-        return self._send_pending_leads_via_n8n()
+        """
+        Manual trigger – start sending matching leads now, in the background
+        when queue_job is installed. Like scheduled runs, a run that is
+        paced or exceeds its time budget leaves the rest of the sweep to
+        the scheduler, even for an inactive campaign (until it completes,
+        is cancelled or the campaign is deactivated).
+        """
+        running = self.filtered(lambda campaign: campaign._is_run_in_progress())
+        if running:
+            raise UserError(
+                _("Already sending, please wait for the current run to finish: %s")
+                % ", ".join(running.mapped("name"))
+            )
+        # Let the scheduler finish the sweep, even if the campaign is not active
+        self.manual_sweep = True
+
+        if not self._queue_job_available():
+            return self._send_pending_leads_via_n8n()
+
+        self._enqueue_send()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("AI Call"),
+                "message": _("Sending has been queued and runs in the background."),
+                "type": "info",
+                "sticky": False,
+            },
+        }
+
+    def action_cancel_sweep(self):
+        """Stop the sweep in progress; the next run starts over."""
+        self._reset_sweep()
+        return True
 
     # ---------------------------------------------------
     # CRON ENTRY POINT
     # ---------------------------------------------------
     @api.model
     def _cron_run_n8n_campaigns(self):
-        """Cron: auto-run active campaigns in parallel using threads."""
-        campaigns = self.search([("is_active", "=", True)])
-        if not campaigns:
+        """
+        Cron: auto-run active campaigns, and continue the sweeps started
+        manually, in parallel, as queue_job jobs when available, otherwise
+        using threads.
+        """
+        # Single cheap query: most ticks have nothing to do
+        self.flush_model(["is_active", "manual_sweep", "webhook_url", "next_run_at"])
+        self.env.cr.execute(
+            """
+            SELECT id
+              FROM n8n_campaign
+             WHERE (is_active OR manual_sweep)
+               AND COALESCE(webhook_url, '') != ''
+               AND (next_run_at IS NULL OR next_run_at <= %s)
+            """,
+            (fields.Datetime.now(),),
+        )
+        campaign_ids = [row[0] for row in self.env.cr.fetchall()]
+        if not campaign_ids:
             _logger.info("No active campaigns found")
             return
+        self.env["n8n.campaign.log"]._release_stale_claims()
+        # Commit before any run starts: a run claiming a released record
+        # waits on these row locks, while this transaction waits for it
+        self.env.cr.commit()
+        campaigns = self.browse(campaign_ids)
 
         # Filter campaigns within time window
         campaigns_to_run = []
@@ -380,6 +1157,11 @@ class N8nCampaign(models.Model):
             _logger.info("No campaigns within time window")
             return
 
+        # With queue_job, hand the work to the job runner and return at once
+        if self._queue_job_available():
+            self.browse([campaign.id for campaign in campaigns_to_run])._enqueue_send()
+            return
+
         _logger.info(
             "Starting %d campaign(s) in parallel",
             len(campaigns_to_run)
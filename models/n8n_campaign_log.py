@@ -1,4 +1,11 @@
-from odoo import models, fields
+from datetime import timedelta
+
+from odoo import api, models, fields
+from odoo.tools import SQL
+from odoo.tools.sql import create_index, index_exists
+
+# Pending logs older than this were interrupted (e.g. server restart)
+PENDING_TIMEOUT = timedelta(hours=1)
 
 
 class N8nCampaignLog(models.Model):
@@ -11,15 +18,17 @@ class N8nCampaignLog(models.Model):
         string="Campaign",
         required=True,
         ondelete="cascade",
+        index=True,
     )
 
     lead_id = fields.Many2one(
         "crm.lead",
         string="Lead",
         ondelete="set null",
+        index=True,
     )
 
-    lead_odoo_id = fields.Integer(string="Lead ID (Odoo)")
+    lead_odoo_id = fields.Integer(string="Lead ID (Odoo)", index=True)
     name = fields.Char(string="Lead Name")
     email = fields.Char(string="Email")
     phone = fields.Char(string="Phone")
@@ -34,8 +43,108 @@ class N8nCampaignLog(models.Model):
         string="Status",
         default="pending",
         required=True,
+        index=True,
     )
 
     http_status = fields.Char(string="HTTP Status")
     message = fields.Char(string="Message")
     sent_at = fields.Datetime(string="Sent At")
+
+    def init(self):
+        # Serves the per-campaign "already sent" lookups and anti-joins
+        create_index(
+            self.env.cr,
+            "n8n_campaign_log_campaign_status_lead_idx",
+            self._table,
+            ["campaign_id", "status", "lead_odoo_id"],
+        )
+
+        # A record can only be in flight once per campaign: concurrent runs
+        # claim records by inserting pending logs against this index.
+        if not index_exists(self.env.cr, "n8n_campaign_log_pending_unique_idx"):
+            self.env.cr.execute(
+                """
+                UPDATE n8n_campaign_log log
+                   SET status = 'error', message = 'Interrupted'
+                 WHERE log.status = 'pending'
+                   AND EXISTS (
+                        SELECT 1
+                          FROM n8n_campaign_log other
+                         WHERE other.campaign_id = log.campaign_id
+                           AND other.lead_odoo_id = log.lead_odoo_id
+                           AND other.status = 'pending'
+                           AND other.id > log.id
+                   )
+                """
+            )
+            self.env.cr.execute(
+                """
+                CREATE UNIQUE INDEX n8n_campaign_log_pending_unique_idx
+                    ON n8n_campaign_log (campaign_id, lead_odoo_id)
+                 WHERE status = 'pending'
+                """
+            )
+
+    @api.model
+    def _claim_records(self, campaign, records):
+        """
+        Insert pending logs for the given payload records in one statement.
+        Records already in flight for the campaign are skipped by the
+        database (ON CONFLICT DO NOTHING). Runs of a campaign are
+        serialized by its advisory lock, so those can only be claims left
+        by an interrupted run, not yet released as stale.
+
+        Return the created logs and the ids of the claimed records.
+        """
+        if not records:
+            return self.browse(), set()
+        self.flush_model()
+        cr = self.env.cr
+        now = cr.now()
+        uid = self.env.uid
+        values = SQL(", ").join(
+            SQL(
+                "(%s, %s, %s, %s, %s, %s, 'pending', %s, %s, %s, %s)",
+                campaign.id,
+                record["id"],
+                record["id"],
+                record["name"],
+                record["email"],
+                record["phone"],
+                uid,
+                now,
+                uid,
+                now,
+            )
+            for record in records
+        )
+        cr.execute(
+            SQL(
+                """
+                INSERT INTO n8n_campaign_log (
+                    campaign_id, lead_id, lead_odoo_id, name, email, phone,
+                    status, create_uid, create_date, write_uid, write_date
+                )
+                VALUES %s
+                ON CONFLICT (campaign_id, lead_odoo_id) WHERE status = 'pending'
+                DO NOTHING
+                RETURNING id, lead_odoo_id
+                """,
+                values,
+            )
+        )
+        rows = cr.fetchall()
+        campaign.invalidate_recordset(["log_ids"])
+        return self.browse([row[0] for row in rows]), {row[1] for row in rows}
+
+    @api.model
+    def _release_stale_claims(self):
+        """Mark pending logs left behind by an interrupted run as errors."""
+        stale = self.search(
+            [
+                ("status", "=", "pending"),
+                ("create_date", "<", fields.Datetime.now() - PENDING_TIMEOUT),
+            ]
+        )
+        if stale:
+            stale.write({"status": "error", "message": "Interrupted"})